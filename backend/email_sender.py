@@ -14,21 +14,160 @@ Requirements:
 - SENDER_EMAIL environment variable (Gmail)
 - SENDER_PASSWORD environment variable (Gmail app password)
 - SENDER_NAME environment variable (optional)
+- sentence-transformers + numpy (optional, enables the semantic generation cache)
 """
 
 import os
+import re
+import time
+import base64
+import hashlib
+import queue
+import atexit
+import asyncio
 import smtplib
+import threading
 import json
+import logging
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-from email.mime.text import MIMEText
-from groq import Groq
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Callable, List, Dict, Any, Iterator, Optional, Tuple, Union
+from email.message import EmailMessage
+import httpx
+from groq import AsyncGroq, DefaultAsyncHttpxClient, RateLimitError
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+# Semantic generation cache is optional (sentence-transformers pulls in torch)
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_CACHE_AVAILABLE = True
+except ImportError:
+    SEMANTIC_CACHE_AVAILABLE = False
+
+# HTTP/2 for the Groq client needs the optional h2 package
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 # Load environment variables
 load_dotenv()
 
+def env_log_level() -> int:
+    """Logging level named by LOG_LEVEL, falling back to INFO when unset or unknown"""
+    level = logging.getLevelName(os.getenv("LOG_LEVEL", "INFO").strip().upper())
+    return level if isinstance(level, int) else logging.INFO
+
+logger = logging.getLogger(__name__)
+logger.setLevel(env_log_level())
+
+GROQ_MODEL = "llama-3.1-8b-instant"
+
+SMTP_HOST = "smtp.gmail.com"
+SMTP_PORT = 587
+
+# Gmail throttles bursts and long-lived sessions: 5 connections x 100 messages each
+SMTP_POOL_SIZE = 5
+SMTP_MAX_MESSAGES_PER_CONN = 100
+
+# Pooled connections used more recently than this are handed out without a NOOP check
+SMTP_NOOP_AFTER_IDLE = 5
+
+# Transient SMTP replies worth retrying
+SMTP_RETRY_CODES = {421, 450, 554}
+
+# Retry policy for transient Groq/SMTP/SendGrid errors: exponential backoff with jitter,
+# or the provider's Retry-After header when it sends one
+RETRY_MAX_ATTEMPTS = 4
+RETRY_INITIAL_WAIT = 1
+RETRY_MAX_WAIT = 30
+
+# Upper bound on in-flight Groq requests so large campaigns stay within rate limits
+MAX_CONCURRENT_GENERATIONS = 10
+
+# Generated bodies are reused for identical (exact tier) or near-identical (semantic tier) personas
+GENERATION_CACHE_SIZE = 4096
+GENERATION_CACHE_PATH = Path.home() / ".cache" / "campaignai" / "gencache.json"
+SEMANTIC_CACHE_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+SEMANTIC_CACHE_THRESHOLD = 0.95
+
+# Abort the rest of a campaign once >= 1/3 of at least 30 attempts have failed
+ABORT_MIN_ATTEMPTS = 30
+ABORT_FAILURE_RATIO = 1 / 3
+ABORTED_ERROR_MESSAGE = "aborted after high failure rate"
+
+# Recipients per Groq call; each email is <100 words so 20 fit comfortably in the context window
+GENERATION_BATCH_SIZE = 20
+
+# Campaign-wide instructions go in the system message and only the recipient details
+# in the user message, so every request in a campaign shares the same cacheable prefix
+EMAIL_SYSTEM_PROMPT_TEMPLATE = """You are an expert advertising copywriter for {company_name}.
+Write a personalized, friendly, and persuasive marketing email for a campaign.
+The user message contains the recipient details (name and interests/preferences).
+
+Campaign Description:
+{campaign_description}
+
+Guidelines:
+- Keep it under 100 words.
+- Make it conversational and emotionally engaging.
+- Highlight how this offer or campaign benefits the recipient personally.
+- End with a warm closing from {company_name}.
+"""
+
+# Per-recipient user message for single-recipient calls
+_USER_TMPL = "Name: {name}\nInterests: {persona}"
+
+# Appended to the recipients JSON when several recipients share one Groq call
+EMAIL_BATCH_USER_PROMPT = (
+    "Write one email for each recipient below. Respond with a JSON object of the form "
+    '{"emails": [{"name": "...", "body": "..."}]} containing exactly one entry per recipient, '
+    "in the same order as the input.\nRecipients: "
+)
+
+@dataclass(frozen=True)
+class Settings:
+    """Email service configuration read from the environment"""
+    sender_email: str
+    groq_api_key: str
+    sender_password: Optional[str] = None  # Required for Gmail SMTP
+    sendgrid_api_key: Optional[str] = None  # Required for SendGrid
+    sender_name: Optional[str] = None
+
+@lru_cache(maxsize=1)
+def settings() -> Settings:
+    """
+    Read and validate email service settings once per process
+    
+    Returns:
+        Settings: Cached settings
+    
+    Raises:
+        ValueError: If GROQ_API_KEY or SENDER_EMAIL is missing
+    """
+    missing = [name for name in ("SENDER_EMAIL", "GROQ_API_KEY") if not os.environ.get(name)]
+    if missing:
+        error_msg = f"❌ Missing {', '.join(missing)} in environment variables. Please set these to send email campaigns."
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+    return Settings(
+        sender_email=os.environ["SENDER_EMAIL"],
+        groq_api_key=os.environ["GROQ_API_KEY"],
+        sender_password=os.environ.get("SENDER_PASSWORD") or None,
+        sendgrid_api_key=os.environ.get("SENDGRID_API_KEY") or None,
+        sender_name=os.environ.get("SENDER_NAME") or None
+    )
+
 class EmailRecipient(BaseModel):
     """Email recipient model"""
     name: str = Field(..., description="Recipient name")
@@ -43,22 +182,787 @@ class EmailCampaignRequest(BaseModel):
     sender_name: Optional[str] = Field(None, description="Sender name (defaults to company name)")
     email_subject: Optional[str] = Field(None, description="Email subject (defaults to 'Special Offer from {company_name}!')")
 
-class EmailDeliveryStatus(BaseModel):
-    """Email delivery status model"""
-    recipient_name: str = Field(..., description="Recipient name")
-    recipient_email: str = Field(..., description="Recipient email")
-    status: str = Field(..., description="Delivery status: 'sent', 'failed'")
-    error_message: Optional[str] = Field(None, description="Error message if failed")
-    email_content: Optional[str] = Field(None, description="Generated email content")
-
-class EmailCampaignResponse(BaseModel):
-    """Email campaign response model"""
-    campaign_summary: Dict[str, Any] = Field(..., description="Campaign summary")
-    delivery_results: List[EmailDeliveryStatus] = Field(..., description="Email delivery results")
-    execution_status: str = Field(..., description="Execution status: 'success', 'partial_success', 'failed'")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Execution timestamp")
+# Result types are built in-process from already-validated data, so they are plain
+# slotted dataclasses rather than Pydantic models (FastAPI serializes both)
+@dataclass(frozen=True, slots=True)
+class EmailDeliveryStatus:
+    """Email delivery status"""
+    recipient_name: str
+    recipient_email: str
+    status: str  # 'sent', 'failed', 'skipped'
+    error_message: Optional[str] = None
+    email_content: Optional[str] = None
+    
+    def model_dump(self) -> Dict[str, Any]:
+        return asdict(self)
 
-def send_email_campaign(request: EmailCampaignRequest) -> EmailCampaignResponse:
+@dataclass(frozen=True, slots=True)
+class EmailCampaignResponse:
+    """Email campaign response"""
+    campaign_summary: Dict[str, Any]
+    delivery_results: List[EmailDeliveryStatus]
+    execution_status: str  # 'success', 'partial_success', 'failed'
+    timestamp: datetime = field(default_factory=datetime.now)
+    
+    def model_dump(self) -> Dict[str, Any]:
+        return asdict(self)
+
+_exponential_wait = wait_exponential_jitter(initial=RETRY_INITIAL_WAIT, max=RETRY_MAX_WAIT)
+
+def _wait_retry_after(retry_state) -> float:
+    """Wait for the provider's Retry-After header if present, else exponential backoff with jitter"""
+    exc = retry_state.outcome.exception()
+    headers = getattr(exc, "headers", None)
+    if headers is None and getattr(exc, "response", None) is not None:
+        headers = exc.response.headers
+    try:
+        return min(float(headers.get("retry-after")), RETRY_MAX_WAIT)
+    except (AttributeError, TypeError, ValueError):
+        return _exponential_wait(retry_state)
+
+def _log_retry(retry_state) -> None:
+    logger.warning(
+        "⏳ Transient error (%s), retrying in %.1fs (attempt %s/%s)...",
+        retry_state.outcome.exception(), retry_state.next_action.sleep,
+        retry_state.attempt_number, RETRY_MAX_ATTEMPTS
+    )
+
+def with_retry(predicate: Callable[[BaseException], bool]):
+    """
+    Retry decorator for transient provider errors (works on sync and async functions)
+    
+    Args:
+        predicate (Callable[[BaseException], bool]): Returns True for exceptions worth retrying
+    
+    Returns:
+        Decorator that retries up to RETRY_MAX_ATTEMPTS times and re-raises the last error
+    """
+    return retry(
+        wait=_wait_retry_after,
+        stop=stop_after_attempt(RETRY_MAX_ATTEMPTS),
+        retry=retry_if_exception(predicate),
+        before_sleep=_log_retry,
+        reraise=True
+    )
+
+def _open_smtp(host: str, port: int, user: str, password: str) -> smtplib.SMTP:
+    """Open a new SMTP connection, upgrade it to TLS and log in"""
+    logger.debug("📬 Connecting to %s:%s...", host, port)
+    server = smtplib.SMTP(host, port, timeout=30)
+    try:
+        logger.debug("🔐 Starting TLS encryption...")
+        server.starttls()
+        logger.debug("🔑 Logging in as %s...", user)
+        server.login(user, password)
+        logger.debug("✅ SMTP login successful!")
+    except Exception:
+        server.close()
+        raise
+    return server
+
+class PooledSMTP:
+    """Authenticated SMTP connection that tracks how many messages it has sent"""
+    
+    def __init__(self, host: str, port: int, user: str, password: str):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.server: Optional[smtplib.SMTP] = None
+        self.sent_count = 0
+        self.last_used = 0.0
+    
+    def ensure_connected(self) -> None:
+        """(Re)open the connection if it was never opened, rotated out or dropped by the server"""
+        if self.server is not None:
+            # Back-to-back sends skip the NOOP round trip; a drop in between
+            # surfaces as SMTPServerDisconnected, which _smtp_send retries
+            if time.monotonic() - self.last_used < SMTP_NOOP_AFTER_IDLE:
+                return
+            try:
+                if self.server.noop()[0] == 250:
+                    self.last_used = time.monotonic()
+                    return
+            except (smtplib.SMTPException, OSError):
+                pass
+            logger.debug("🔄 Pooled SMTP connection is stale, reconnecting...")
+            self.close()
+        self.server = _open_smtp(self.host, self.port, self.user, self.password)
+        self.sent_count = 0
+        self.last_used = time.monotonic()
+    
+    def send_message(self, msg) -> None:
+        try:
+            self.server.send_message(msg)
+        finally:
+            self.last_used = time.monotonic()
+    
+    def close(self) -> None:
+        """Quit the connection; it is reopened lazily on next use"""
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except (smtplib.SMTPException, OSError):
+                self.server.close()
+        self.server = None
+        self.sent_count = 0
+
+class SMTPConnectionPool:
+    """
+    Bounded pool of authenticated SMTP connections
+    
+    Connections are opened lazily and rotated out once they have sent
+    max_messages_per_conn messages, since Gmail throttles long-lived sessions.
+    """
+    
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        size: int = SMTP_POOL_SIZE,
+        max_messages_per_conn: int = SMTP_MAX_MESSAGES_PER_CONN
+    ):
+        self.size = size
+        self.max_messages_per_conn = max_messages_per_conn
+        # LIFO so recently used (still connected) sessions are handed out first
+        self._idle: "queue.LifoQueue[PooledSMTP]" = queue.LifoQueue()
+        self._connections = [PooledSMTP(host, port, user, password) for _ in range(size)]
+        for conn in self._connections:
+            self._idle.put(conn)
+    
+    def acquire(self) -> PooledSMTP:
+        """Take a live connection out of the pool (blocks while all are in use)"""
+        conn = self._idle.get()
+        try:
+            conn.ensure_connected()
+        except Exception:
+            self._idle.put(conn)
+            raise
+        return conn
+    
+    def warm_up(self) -> None:
+        """Open one connection so credential errors surface before any sends"""
+        conn = self.acquire()
+        self._idle.put(conn)
+    
+    def release(self, conn: PooledSMTP) -> None:
+        """Return a connection after a send, rotating it out once it hits the message cap"""
+        conn.sent_count += 1
+        if conn.sent_count >= self.max_messages_per_conn:
+            conn.close()
+        self._idle.put(conn)
+    
+    def discard(self, conn: PooledSMTP) -> None:
+        """Return a broken connection; it will reconnect on next acquire"""
+        conn.close()
+        self._idle.put(conn)
+    
+    def close(self) -> None:
+        for conn in self._connections:
+            conn.close()
+
+# Connection pools reused across campaigns, keyed by (host, port, user)
+_smtp_pools: Dict[tuple, SMTPConnectionPool] = {}
+
+def get_smtp_pool(host: str, port: int, user: str, password: str) -> SMTPConnectionPool:
+    """
+    Get the SMTP connection pool for a sender, creating it on first use
+    
+    Args:
+        host (str): SMTP server host
+        port (int): SMTP server port
+        user (str): Login user (sender email)
+        password (str): Login password (Gmail app password)
+    
+    Returns:
+        SMTPConnectionPool: Pool shared by all campaigns from this sender
+    """
+    key = (host, port, user)
+    pool = _smtp_pools.get(key)
+    if pool is None:
+        pool = SMTPConnectionPool(host, port, user, password)
+        _smtp_pools[key] = pool
+    return pool
+
+def _close_smtp_pools() -> None:
+    """Quit all pooled SMTP connections (registered with atexit)"""
+    for pool in _smtp_pools.values():
+        pool.close()
+    _smtp_pools.clear()
+
+atexit.register(_close_smtp_pools)
+
+# Idle connections the shared Groq client keeps open between requests
+GROQ_MAX_KEEPALIVE_CONNECTIONS = 20
+
+# httpx.AsyncClient is bound to the event loop it first runs on, so the shared
+# Groq clients are cached per loop and API key (one per process under FastAPI, and
+# a fresh one for each asyncio.run() from the sync wrappers, closed before it ends)
+_groq_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AsyncGroq]]" = weakref.WeakKeyDictionary()
+
+def get_groq_client(api_key: str) -> AsyncGroq:
+    """
+    Get the shared async Groq client for the running event loop
+    
+    The client keeps HTTP/2 (when h2 is installed) keep-alive connections open
+    so repeated campaigns reuse TLS sessions instead of reconnecting.
+    
+    Args:
+        api_key (str): Groq API key
+    
+    Returns:
+        AsyncGroq: Client shared by all campaigns on this event loop
+    """
+    clients = _groq_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(api_key)
+    if client is None:
+        client = AsyncGroq(
+            api_key=api_key,
+            # _call_groq retries rate limits itself; SDK retries would multiply them
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_keepalive_connections=GROQ_MAX_KEEPALIVE_CONNECTIONS)
+            )
+        )
+        clients[api_key] = client
+    return client
+
+async def close_groq_clients() -> None:
+    """Close the running loop's Groq clients (called by the sync wrappers before their loop ends)"""
+    for client in _groq_clients.pop(asyncio.get_running_loop(), {}).values():
+        await client.close()
+
+def _is_transient_smtp_error(exc: BaseException) -> bool:
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(exc, smtplib.SMTPResponseException) and exc.smtp_code in SMTP_RETRY_CODES
+
+@with_retry(_is_transient_smtp_error)
+def _smtp_send(pool: SMTPConnectionPool, msg) -> None:
+    """Send a message through the pool, retrying transient SMTP errors on a fresh acquire"""
+    conn = pool.acquire()
+    try:
+        conn.send_message(msg)
+    except smtplib.SMTPServerDisconnected:
+        pool.discard(conn)
+        raise
+    except smtplib.SMTPResponseException as e:
+        # 421 means the server is closing the connection
+        if e.smtp_code == 421:
+            pool.discard(conn)
+        else:
+            pool.release(conn)
+        raise
+    except smtplib.SMTPException:
+        # e.g. SMTPRecipientsRefused: smtplib has already sent RSET, so the
+        # session is still usable
+        pool.release(conn)
+        raise
+    except OSError:
+        # Socket error (SMTPException is an OSError too, hence this order)
+        pool.discard(conn)
+        raise
+    except Exception:
+        pool.release(conn)
+        raise
+    pool.release(conn)
+
+def _build_system_prompt(company_name: str, campaign_description: str) -> str:
+    """Build the campaign-wide system prompt (identical for every recipient)"""
+    return EMAIL_SYSTEM_PROMPT_TEMPLATE.format_map({
+        "company_name": company_name,
+        "campaign_description": campaign_description
+    })
+
+@with_retry(lambda exc: isinstance(exc, RateLimitError))
+async def _call_groq(groq_client: AsyncGroq, **kwargs):
+    """chat.completions.create with retries on Groq rate limiting (429)"""
+    return await groq_client.chat.completions.create(**kwargs)
+
+def _log_prompt_cache_usage(usage) -> None:
+    """Report how many prompt tokens Groq served from its prefix cache"""
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None)
+    if cached_tokens is not None:
+        logger.debug("🧠 Prompt cache: %s/%s prompt tokens cached", cached_tokens, usage.prompt_tokens)
+
+async def _stream_completion(groq_client: AsyncGroq, **kwargs) -> str:
+    """Stream a chat completion and return the accumulated message content"""
+    stream = await _call_groq(groq_client, stream=True, **kwargs)
+    buf = []
+    # Closing the stream releases its response back to the shared keep-alive pool
+    async with stream:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            if choice.delta.content:
+                buf.append(choice.delta.content)
+            if choice.finish_reason:
+                # Groq reports usage on the final chunk
+                x_groq = getattr(chunk, "x_groq", None)
+                _log_prompt_cache_usage(getattr(x_groq, "usage", None) or getattr(chunk, "usage", None))
+                break
+    return "".join(buf)
+
+async def generate_email(
+    groq_client: AsyncGroq,
+    system_prompt: str,
+    recipient: EmailRecipient
+) -> str:
+    """Generate the email body for a single recipient with Groq"""
+    logger.debug("📧 Generating email for %s...", recipient.name)
+    try:
+        email_content = await _stream_completion(
+            groq_client,
+            model=GROQ_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": _USER_TMPL.format_map({
+                    "name": recipient.name,
+                    "persona": recipient.personal_description
+                })}
+            ]
+        )
+    except Exception as groq_error:
+        error_msg = f"❌ Groq API error: {str(groq_error)}"
+        logger.warning(error_msg)
+        raise Exception(error_msg)
+    # Only trailing whitespace in practice; rstrip() returns the same string when there is none
+    email_content = email_content.rstrip()
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("✅ Email content generated for %s (%s chars)", recipient.name, len(email_content))
+    return email_content
+
+def _chunked(items: List[Any], size: int) -> Iterator[List[Any]]:
+    """Split a list into consecutive chunks of at most `size` items"""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+async def generate_email_batch(
+    groq_client: AsyncGroq,
+    system_prompt: str,
+    recipients: List[EmailRecipient]
+) -> List[str]:
+    """
+    Generate email bodies for several recipients with a single Groq call
+    
+    The model is asked for a JSON object with one email per recipient, in order;
+    each entry's name is checked against its recipient so a reordered response
+    is rejected instead of sending bodies to the wrong people.
+    
+    Args:
+        groq_client (AsyncGroq): Initialized async Groq client
+        system_prompt (str): Campaign system prompt
+        recipients (List[EmailRecipient]): Recipients in this batch
+    
+    Returns:
+        List[str]: Email body per recipient, in the same order
+    
+    Raises:
+        ValueError: If the response is not valid JSON or does not contain one email per recipient,
+                    in order
+    """
+    logger.debug("📧 Generating %s emails in one batch...", len(recipients))
+    recipients_json = json.dumps([
+        {"name": r.name, "interests": r.personal_description} for r in recipients
+    ])
+    response = await _call_groq(
+        groq_client,
+        model=GROQ_MODEL,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": EMAIL_BATCH_USER_PROMPT + recipients_json}
+        ],
+        response_format={"type": "json_object"}
+    )
+    _log_prompt_cache_usage(response.usage)
+    
+    emails = json.loads(response.choices[0].message.content).get("emails")
+    if not isinstance(emails, list) or len(emails) != len(recipients):
+        raise ValueError(f"expected {len(recipients)} emails in batch response")
+    bodies = []
+    for recipient, email in zip(recipients, emails):
+        if not isinstance(email, dict):
+            raise ValueError("batch response contains a malformed email entry")
+        name = email.get("name")
+        if not isinstance(name, str) or name.strip().casefold() != recipient.name.strip().casefold():
+            raise ValueError(f"batch response entry {name!r} does not match recipient {recipient.name!r}")
+        body = email.get("body")
+        if not isinstance(body, str) or not (body := body.rstrip()):
+            raise ValueError("batch response contains an empty email body")
+        bodies.append(body)
+    logger.debug("✅ Email content generated for %s recipients", len(bodies))
+    return bodies
+
+def _persona_hash(personal_description: str) -> str:
+    """Short digest used to group recipients with identical personas"""
+    return hashlib.blake2b(personal_description.encode(), digest_size=8).hexdigest()
+
+def dedupe_recipients(request: EmailCampaignRequest) -> EmailCampaignRequest:
+    """
+    Drop repeated recipient addresses (case-insensitive), keeping the first occurrence
+    
+    Args:
+        request (EmailCampaignRequest): Email campaign request
+    
+    Returns:
+        EmailCampaignRequest: The same request, or a copy without duplicate addresses
+    """
+    seen: set[str] = set()
+    unique = []
+    for recipient in request.recipients:
+        key = recipient.email.strip().lower()
+        if key not in seen:
+            seen.add(key)
+            unique.append(recipient)
+    duplicates = len(request.recipients) - len(unique)
+    if not duplicates:
+        return request
+    logger.info("🧹 Skipping %s duplicate recipient address(es)", duplicates)
+    return request.model_copy(update={"recipients": unique})
+
+def _readdress(email_content: str, cached_name: str, name: str) -> str:
+    """
+    Swap the recipient name in a cached email body for the new recipient's name
+    
+    Names are only matched as whole words. A bare first name followed by a
+    lowercase word is left alone, since that is ordinary text ("Will you...")
+    rather than the recipient being addressed ("Hi Will,").
+    """
+    if cached_name == name or not cached_name.strip():
+        return email_content
+    # Lookarounds rather than \b, which fails next to a name's own punctuation ("Jr.")
+    email_content = re.sub(rf"(?<!\w){re.escape(cached_name)}(?!\w)", lambda _: name, email_content)
+    cached_first, first = cached_name.split()[:1], name.split()[:1]
+    if cached_first and first and cached_first != first:
+        email_content = re.sub(
+            rf"(?<!\w){re.escape(cached_first[0])}(?!\w)(?!\s+[a-z])", lambda _: first[0], email_content
+        )
+    return email_content
+
+@lru_cache(maxsize=1)
+def _get_embedding_model() -> "SentenceTransformer":
+    return SentenceTransformer(SEMANTIC_CACHE_MODEL)
+
+def _embed_personas(personas: List[str]) -> "np.ndarray":
+    """Embed personas as unit vectors so a dot product is the cosine similarity"""
+    return _get_embedding_model().encode(personas, normalize_embeddings=True).astype(np.float32)
+
+class GenerationCache:
+    """
+    Two-tier cache of generated email bodies, scoped per campaign
+    
+    - Exact tier: LRU keyed by (company, campaign, personal_description)
+    - Semantic tier: cosine similarity between persona embeddings, reused when
+      similarity >= threshold (requires sentence-transformers)
+    
+    Entries are persisted as JSON so repeated campaigns survive restarts.
+    """
+    
+    def __init__(
+        self,
+        path: Path = GENERATION_CACHE_PATH,
+        maxsize: int = GENERATION_CACHE_SIZE,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD
+    ):
+        self.path = path
+        self.maxsize = maxsize
+        self.threshold = threshold
+        # (campaign_key, persona) -> {"name", "body", "embedding"}
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._load()
+    
+    @staticmethod
+    def campaign_key(company_name: str, campaign_description: str) -> str:
+        return hashlib.sha256(f"{company_name}\x00{campaign_description}".encode()).hexdigest()
+    
+    def get(self, campaign_key: str, persona: str) -> Optional[Tuple[str, str]]:
+        """Exact-match lookup, returns (cached_name, body)"""
+        entry = self._entries.get((campaign_key, persona))
+        if entry is None:
+            return None
+        self._entries.move_to_end((campaign_key, persona))
+        return entry["name"], entry["body"]
+    
+    def get_similar(self, campaign_key: str, embeddings: "np.ndarray") -> List[Optional[Tuple[str, str]]]:
+        """Semantic lookup for a batch of persona embeddings, returns (cached_name, body) or None per row"""
+        candidates = [
+            entry for (key, _), entry in self._entries.items()
+            if key == campaign_key and entry["embedding"] is not None
+        ]
+        if not candidates:
+            return [None] * len(embeddings)
+        matrix = np.stack([entry["embedding"] for entry in candidates])
+        scores = embeddings @ matrix.T
+        best = scores.argmax(axis=1)
+        return [
+            (candidates[j]["name"], candidates[j]["body"]) if scores[i, j] >= self.threshold else None
+            for i, j in enumerate(best)
+        ]
+    
+    def put(
+        self,
+        campaign_key: str,
+        persona: str,
+        name: str,
+        body: str,
+        embedding: Optional["np.ndarray"] = None
+    ) -> None:
+        self._entries[(campaign_key, persona)] = {"name": name, "body": body, "embedding": embedding}
+        self._entries.move_to_end((campaign_key, persona))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Serializable copy of the cache (taken on the event loop, written from a worker thread)"""
+        return [
+            {
+                "campaign_key": key,
+                "persona": persona,
+                "name": entry["name"],
+                "body": entry["body"],
+                "embedding": (
+                    base64.b64encode(entry["embedding"].tobytes()).decode()
+                    if entry["embedding"] is not None else None
+                )
+            }
+            for (key, persona), entry in self._entries.items()
+        ]
+    
+    def save(self, snapshot: List[Dict[str, Any]]) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(snapshot))
+            tmp_path.replace(self.path)
+        except OSError as e:
+            logger.warning("⚠️ Could not persist generation cache: %s", e)
+    
+    def _load(self) -> None:
+        try:
+            records = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        for record in records[-self.maxsize:]:
+            embedding = None
+            if record.get("embedding") and SEMANTIC_CACHE_AVAILABLE:
+                embedding = np.frombuffer(base64.b64decode(record["embedding"]), dtype=np.float32)
+            self._entries[(record["campaign_key"], record["persona"])] = {
+                "name": record["name"],
+                "body": record["body"],
+                "embedding": embedding
+            }
+
+@lru_cache(maxsize=1)
+def get_generation_cache() -> GenerationCache:
+    return GenerationCache()
+
+class CampaignAbortedError(Exception):
+    """Raised for recipients skipped after the campaign's failure breaker tripped"""
+
+class FailureBreaker:
+    """
+    Campaign-wide failure counter that trips once a large enough share of attempts has failed
+    
+    When Groq or the mail provider is degraded, stopping early saves the tokens and
+    timeouts that every remaining recipient would otherwise burn. Each recipient is
+    recorded once: a failed generation, or else the result of its send. Thread-safe,
+    since SMTP sends record outcomes from worker threads.
+    """
+    
+    def __init__(
+        self,
+        min_attempts: int = ABORT_MIN_ATTEMPTS,
+        max_failure_ratio: float = ABORT_FAILURE_RATIO
+    ):
+        self.min_attempts = min_attempts
+        self.max_failure_ratio = max_failure_ratio
+        self.attempts = 0
+        self.failures = 0
+        self.tripped = False
+        self._lock = threading.Lock()
+    
+    def record(self, success: bool) -> None:
+        with self._lock:
+            self.attempts += 1
+            if not success:
+                self.failures += 1
+            if (
+                not self.tripped
+                and self.attempts >= self.min_attempts
+                and self.failures / self.attempts >= self.max_failure_ratio
+            ):
+                self.tripped = True
+                logger.warning("🛑 %s/%s attempts failed, aborting remaining sends", self.failures, self.attempts)
+
+def _skipped_status(recipient: EmailRecipient) -> EmailDeliveryStatus:
+    """Delivery status for a recipient skipped after the failure breaker tripped"""
+    return EmailDeliveryStatus(
+        recipient_name=recipient.name,
+        recipient_email=recipient.email,
+        status="skipped",
+        error_message=ABORTED_ERROR_MESSAGE,
+        email_content=None
+    )
+
+async def generate_email_contents(
+    groq_client: AsyncGroq,
+    request: EmailCampaignRequest,
+    breaker: Optional[FailureBreaker] = None,
+    ready_queue: Optional[asyncio.Queue] = None
+) -> List[Union[str, BaseException]]:
+    """
+    Generate personalized email content for every recipient concurrently
+    
+    Recipients whose persona is already in the generation cache (exact or
+    semantically similar) reuse the cached body, and recipients repeating a
+    persona from earlier in the same request reuse that recipient's body.
+    All remaining Groq calls are fanned out at once and bounded by
+    MAX_CONCURRENT_GENERATIONS, so total latency is roughly one round-trip
+    instead of one per recipient.
+    
+    Once the failure breaker trips, Groq calls that have not started yet are
+    skipped and reported as CampaignAbortedError.
+    
+    If ready_queue is given, each (index, content) pair is pushed onto it as soon
+    as that recipient is settled, so a consumer can start sending while the rest
+    are still generating. The caller is responsible for signalling the end.
+    
+    Args:
+        groq_client (AsyncGroq): Initialized async Groq client
+        request (EmailCampaignRequest): Email campaign request
+        breaker (Optional[FailureBreaker]): Campaign-wide failure breaker (shared with the send phase)
+        ready_queue (Optional[asyncio.Queue]): Queue receiving (index, content) as results arrive
+    
+    Returns:
+        List[Union[str, BaseException]]: Email content per recipient (in request order),
+                                         or the exception raised while generating it
+    """
+    breaker = breaker or FailureBreaker()
+    cache = get_generation_cache()
+    campaign_key = cache.campaign_key(request.company_name, request.campaign_description)
+    recipients = request.recipients
+    email_contents: List[Union[str, BaseException, None]] = [None] * len(recipients)
+    
+    # Recipient index -> later recipients sharing its persona
+    followers: Dict[int, List[int]] = {}
+    
+    def settle(i: int, email_content: Union[str, BaseException]) -> None:
+        for j in [i, *followers.get(i, ())]:
+            content = email_content
+            if j != i and isinstance(email_content, str):
+                content = _readdress(email_content, recipients[i].name, recipients[j].name)
+            email_contents[j] = content
+            if ready_queue is not None:
+                ready_queue.put_nowait((j, content))
+    
+    # A body written without a name can't be readdressed and a cached one can't be
+    # addressed to a recipient without one, so nameless recipients skip the cache
+    # tiers and persona sharing and always get their own generation
+    unnamed = [i for i, recipient in enumerate(recipients) if not recipient.name.strip()]
+    
+    # Exact tier
+    misses = []
+    for i, recipient in enumerate(recipients):
+        if not recipient.name.strip():
+            continue
+        hit = cache.get(campaign_key, recipient.personal_description)
+        if hit is not None:
+            settle(i, _readdress(hit[1], hit[0], recipient.name))
+        else:
+            misses.append(i)
+    
+    # Identical personas within this campaign share one generation
+    leaders: Dict[str, int] = {}
+    for i in misses:
+        leader = leaders.setdefault(_persona_hash(recipients[i].personal_description), i)
+        if leader != i:
+            followers.setdefault(leader, []).append(i)
+    misses = list(leaders.values())
+    
+    # Semantic tier
+    embeddings: Dict[int, "np.ndarray"] = {}
+    if misses and SEMANTIC_CACHE_AVAILABLE:
+        try:
+            vectors = await asyncio.to_thread(
+                _embed_personas, [recipients[i].personal_description for i in misses]
+            )
+            embeddings = dict(zip(misses, vectors))
+            hits = cache.get_similar(campaign_key, vectors)
+            for i, hit in zip(misses, hits):
+                if hit is not None:
+                    settle(i, _readdress(hit[1], hit[0], recipients[i].name))
+            misses = [i for i in misses if email_contents[i] is None]
+        except Exception as e:
+            logger.warning("⚠️ Semantic cache unavailable: %s", e)
+    misses += unnamed
+    
+    cached_count = sum(1 for content in email_contents if content is not None)
+    if cached_count:
+        logger.info("♻️ Reusing cached email content for %s recipient(s)", cached_count)
+    shared_count = sum(len(followers.get(i, ())) for i in misses)
+    if shared_count:
+        logger.info("♻️ Sharing generated content across %s recipient(s) with repeated personas", shared_count)
+    
+    # Byte-identical across recipients so Groq's automatic prefix cache is hit
+    system_prompt = _build_system_prompt(request.company_name, request.campaign_description)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_GENERATIONS)
+    
+    def finish(i: int, email_content: Union[str, BaseException]) -> None:
+        settle(i, email_content)
+        if isinstance(email_content, CampaignAbortedError):
+            return
+        if isinstance(email_content, BaseException):
+            # Successes are recorded by the send phase; a failed generation is the
+            # final outcome for this recipient and every follower sharing its persona
+            for _ in range(1 + len(followers.get(i, ()))):
+                breaker.record(False)
+        elif recipients[i].name.strip():
+            recipient = recipients[i]
+            cache.put(campaign_key, recipient.personal_description, recipient.name, email_content, embeddings.get(i))
+    
+    async def _gen(i: int) -> None:
+        try:
+            async with semaphore:
+                if breaker.tripped:
+                    raise CampaignAbortedError(ABORTED_ERROR_MESSAGE)
+                email_content = await generate_email(groq_client, system_prompt, recipients[i])
+        except Exception as e:
+            email_content = e
+        # Recorded as soon as it settles so the breaker can stop calls still queued
+        finish(i, email_content)
+    
+    async def _gen_batch(batch: List[int]) -> None:
+        if len(batch) > 1:
+            results: Optional[List[Union[str, BaseException]]] = None
+            async with semaphore:
+                if breaker.tripped:
+                    results = [CampaignAbortedError(ABORTED_ERROR_MESSAGE) for _ in batch]
+                else:
+                    try:
+                        results = await generate_email_batch(groq_client, system_prompt, [recipients[i] for i in batch])
+                    except Exception as batch_error:
+                        logger.warning("⚠️ Batch generation failed (%s), falling back to per-recipient calls", batch_error)
+            if results is not None:
+                for i, email_content in zip(batch, results):
+                    finish(i, email_content)
+                return
+        await asyncio.gather(*[_gen(i) for i in batch])
+    
+    # Several recipients per Groq call instead of one round-trip each
+    await asyncio.gather(*[_gen_batch(batch) for batch in _chunked(misses, GENERATION_BATCH_SIZE)])
+    
+    if misses:
+        await asyncio.to_thread(cache.save, cache.snapshot())
+    
+    return email_contents
+
+async def send_email_campaign_async(request: EmailCampaignRequest) -> EmailCampaignResponse:
     """
     Send personalized email campaign using AI-generated content
     
@@ -80,13 +984,14 @@ def send_email_campaign(request: EmailCampaignRequest) -> EmailCampaignResponse:
         ValueError: If required environment variables are missing
         Exception: If SMTP connection or email sending fails
     """
-    print(f"📧 Starting email campaign for {request.company_name}")
-    print(f"📝 Campaign: {request.campaign_description}")
-    print(f"👥 Recipients: {len(request.recipients)}")
+    logger.info("📧 Starting email campaign for %s", request.company_name)
+    logger.info("📝 Campaign: %s", request.campaign_description)
+    logger.info("👥 Recipients: %s", len(request.recipients))
+    request = dedupe_recipients(request)
     
     # Check if recipients list is empty
     if not request.recipients or len(request.recipients) == 0:
-        print("⚠️ No recipients provided. Returning empty campaign response.")
+        logger.warning("⚠️ No recipients provided. Returning empty campaign response.")
         return EmailCampaignResponse(
             campaign_summary={
                 "company_name": request.company_name,
@@ -105,148 +1010,143 @@ def send_email_campaign(request: EmailCampaignRequest) -> EmailCampaignResponse:
         )
     
     # Get email credentials with detailed logging
-    sender_email = os.getenv("SENDER_EMAIL")
-    sender_password = os.getenv("SENDER_PASSWORD")
-    groq_api_key = os.getenv("GROQ_API_KEY")
-    sender_name = request.sender_name or os.getenv("SENDER_NAME", request.company_name)
-    
-    print(f"🔍 Environment check:")
-    print(f"   SENDER_EMAIL: {'✓ Set' if sender_email else '✗ Missing'}")
-    print(f"   SENDER_PASSWORD: {'✓ Set' if sender_password else '✗ Missing'}")
-    print(f"   GROQ_API_KEY: {'✓ Set' if groq_api_key else '✗ Missing'}")
-    print(f"   SENDER_NAME: {sender_name}")
-    
-    if not sender_email or not sender_password:
-        error_msg = "❌ Missing SENDER_EMAIL or SENDER_PASSWORD in environment variables. Please set these to send emails."
-        print(error_msg)
-        raise ValueError(error_msg)
+    config = settings()
+    sender_email = config.sender_email
+    sender_password = config.sender_password
+    groq_api_key = config.groq_api_key
+    sender_name = request.sender_name or config.sender_name or request.company_name
+    
+    logger.info("🔍 Environment check:")
+    logger.info("   SENDER_EMAIL: %s", '✓ Set' if sender_email else '✗ Missing')
+    logger.info("   SENDER_PASSWORD: %s", '✓ Set' if sender_password else '✗ Missing')
+    logger.info("   GROQ_API_KEY: %s", '✓ Set' if groq_api_key else '✗ Missing')
+    logger.info("   SENDER_NAME: %s", sender_name)
     
-    if not groq_api_key:
-        error_msg = "❌ Missing GROQ_API_KEY in environment variables. Please set this to generate email content."
-        print(error_msg)
+    if not sender_password:
+        error_msg = "❌ Missing SENDER_PASSWORD in environment variables. Please set this to send emails."
+        logger.error(error_msg)
         raise ValueError(error_msg)
     
     # Initialize Groq client
     try:
-        groq_client = Groq(api_key=groq_api_key)
-        print("✅ Groq client initialized successfully")
+        groq_client = get_groq_client(groq_api_key)
+        logger.info("✅ Groq client initialized successfully")
     except Exception as e:
         error_msg = f"❌ Failed to initialize Groq client: {str(e)}"
-        print(error_msg)
+        logger.error(error_msg)
         raise ValueError(error_msg)
     
-    # Track delivery results
-    delivery_results = []
-    successful_sends = 0
-    failed_sends = 0
-    
-    # Send emails using SMTP
-    print(f"📬 Connecting to Gmail SMTP server...")
+    # Send emails using pooled SMTP connections (reused across campaigns)
     try:
-        with smtplib.SMTP("smtp.gmail.com", 587, timeout=30) as server:
-            print("🔐 Starting TLS encryption...")
-            server.starttls()
+        pool = get_smtp_pool(SMTP_HOST, SMTP_PORT, sender_email, sender_password)
+        try:
+            # Log in up front so credential errors surface before any Groq spend
+            # (blocking connect + STARTTLS + AUTH, so kept off the event loop)
+            await asyncio.to_thread(pool.warm_up)
+            logger.info("✅ SMTP connection pool ready")
+        except smtplib.SMTPAuthenticationError as auth_error:
+            error_msg = f"❌ SMTP Authentication failed: {str(auth_error)}\n"
+            error_msg += "   Make sure you're using a Gmail App Password, not your regular password.\n"
+            error_msg += "   Create one at: https://myaccount.google.com/apppasswords"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        except Exception as login_error:
+            error_msg = f"❌ SMTP login error: {str(login_error)}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        
+        breaker = FailureBreaker()
+        # Identical for every recipient
+        subject = request.email_subject or f"Special Offer from {request.company_name}!"
+        from_header = f"{sender_name} <{sender_email}>"
+        
+        def send_one(recipient: EmailRecipient, email_content: Union[str, BaseException]) -> EmailDeliveryStatus:
+            if isinstance(email_content, CampaignAbortedError):
+                return _skipped_status(recipient)
             
-            print(f"🔑 Logging in as {sender_email}...")
             try:
-                server.login(sender_email, sender_password)
-                print("✅ SMTP login successful!")
-            except smtplib.SMTPAuthenticationError as auth_error:
-                error_msg = f"❌ SMTP Authentication failed: {str(auth_error)}\n"
-                error_msg += "   Make sure you're using a Gmail App Password, not your regular password.\n"
-                error_msg += "   Create one at: https://myaccount.google.com/apppasswords"
-                print(error_msg)
-                raise ValueError(error_msg)
-            except Exception as login_error:
-                error_msg = f"❌ SMTP login error: {str(login_error)}"
-                print(error_msg)
-                raise ValueError(error_msg)
-            
-            for recipient in request.recipients:
+                if isinstance(email_content, BaseException):
+                    raise email_content
+                
+                if breaker.tripped:
+                    return _skipped_status(recipient)
+                
+                # Create email message
+                msg = EmailMessage()
+                msg["Subject"] = subject
+                msg["From"] = from_header
+                msg["To"] = recipient.email
+                msg.set_content(email_content)
+                
+                # Send email
+                logger.debug("📤 Sending email to %s...", recipient.email)
                 try:
-                    print(f"📧 Generating email for {recipient.name}...")
-                    
-                    # Generate personalized email content using Groq
-                    prompt = f"""
-                    You are an expert advertising copywriter for {request.company_name}.
-                    Write a personalized, friendly, and persuasive marketing email for a campaign.
-                    
-                    Campaign Description:
-                    {request.campaign_description}
-
-                    Recipient Details:
-                    Name: {recipient.name}
-                    Interests and Preferences: {recipient.personal_description}
-
-                    Guidelines:
-                    - Keep it under 100 words.
-                    - Make it conversational and emotionally engaging.
-                    - Highlight how this offer or campaign benefits the recipient personally.
-                    - End with a warm closing from {request.company_name}.
-                    """
-                    
-                    try:
-                        response = groq_client.chat.completions.create(
-                            model="llama-3.1-8b-instant",
-                            messages=[{"role": "user", "content": prompt}]
-                        )
-                        email_content = response.choices[0].message.content.strip()
-                        print(f"✅ Email content generated ({len(email_content)} chars)")
-                    except Exception as groq_error:
-                        error_msg = f"❌ Groq API error: {str(groq_error)}"
-                        print(error_msg)
-                        raise Exception(error_msg)
-                    
-                    # Create email message
-                    msg = MIMEText(email_content, "plain")
-                    msg["Subject"] = request.email_subject or f"Special Offer from {request.company_name}!"
-                    msg["From"] = f"{sender_name} <{sender_email}>"
-                    msg["To"] = recipient.email
-                    
-                    # Send email
-                    print(f"📤 Sending email to {recipient.email}...")
-                    try:
-                        server.send_message(msg)
-                        print(f"✅ Email sent successfully to {recipient.name}")
-                    except Exception as send_error:
-                        error_msg = f"❌ Failed to send via SMTP: {str(send_error)}"
-                        print(error_msg)
-                        raise Exception(error_msg)
-                    
-                    # Track successful delivery
-                    delivery_results.append(EmailDeliveryStatus(
-                        recipient_name=recipient.name,
-                        recipient_email=recipient.email,
-                        status="sent",
-                        error_message=None,
-                        email_content=email_content
-                    ))
-                    
-                    successful_sends += 1
-                    
-                except Exception as e:
-                    # Track failed delivery
-                    error_detail = str(e)
-                    print(f"❌ Failed to send email to {recipient.name} ({recipient.email}): {error_detail}")
-                    
-                    delivery_results.append(EmailDeliveryStatus(
-                        recipient_name=recipient.name,
-                        recipient_email=recipient.email,
-                        status="failed",
-                        error_message=error_detail,
-                        email_content=None
-                    ))
-                    
-                    failed_sends += 1
-                    continue
+                    _smtp_send(pool, msg)
+                    breaker.record(True)
+                    logger.debug("✅ Email sent successfully to %s", recipient.name)
+                except Exception as send_error:
+                    breaker.record(False)
+                    error_msg = f"❌ Failed to send via SMTP: {str(send_error)}"
+                    logger.debug(error_msg)
+                    raise Exception(error_msg)
+                
+                # Track successful delivery
+                return EmailDeliveryStatus(
+                    recipient_name=recipient.name,
+                    recipient_email=recipient.email,
+                    status="sent",
+                    error_message=None,
+                    email_content=email_content
+                )
+                
+            except Exception as e:
+                # Track failed delivery
+                error_detail = str(e)
+                logger.warning("❌ Failed to send email to %s (%s): %s", recipient.name, recipient.email, error_detail)
+                
+                return EmailDeliveryStatus(
+                    recipient_name=recipient.name,
+                    recipient_email=recipient.email,
+                    status="failed",
+                    error_message=error_detail,
+                    email_content=None
+                )
+        
+        # Pipeline generation and delivery: the producer pushes each body onto the
+        # queue as soon as it is ready and the consumer hands it straight to the
+        # SMTP worker pool, overlapping Groq latency with SMTP round-trips
+        ready_queue: asyncio.Queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        
+        async def produce() -> None:
+            try:
+                await generate_email_contents(groq_client, request, breaker, ready_queue)
+            finally:
+                ready_queue.put_nowait(None)
+        
+        async def consume(executor: ThreadPoolExecutor) -> List[EmailDeliveryStatus]:
+            pending = {}
+            while (item := await ready_queue.get()) is not None:
+                index, email_content = item
+                pending[index] = loop.run_in_executor(executor, send_one, request.recipients[index], email_content)
+            return [await pending[index] for index in range(len(request.recipients))]
+        
+        with ThreadPoolExecutor(max_workers=pool.size) as executor:
+            _, delivery_results = await asyncio.gather(produce(), consume(executor))
     
     except Exception as e:
         error_msg = f"SMTP connection error: {str(e)}"
-        print(f"❌ {error_msg}")
+        logger.error("❌ %s", error_msg)
         raise Exception(error_msg)
     
+    successful_sends = sum(1 for result in delivery_results if result.status == "sent")
+    skipped_sends = sum(1 for result in delivery_results if result.status == "skipped")
+    failed_sends = len(delivery_results) - successful_sends - skipped_sends
+    
     # Determine execution status
-    if successful_sends == len(request.recipients):
+    if breaker.tripped:
+        execution_status = "failed"
+    elif successful_sends == len(request.recipients):
         execution_status = "success"
     elif successful_sends > 0:
         execution_status = "partial_success"
@@ -260,6 +1160,7 @@ def send_email_campaign(request: EmailCampaignRequest) -> EmailCampaignResponse:
         "total_recipients": len(request.recipients),
         "successful_sends": successful_sends,
         "failed_sends": failed_sends,
+        "skipped_sends": skipped_sends,
         "success_rate": round((successful_sends / len(request.recipients)) * 100, 2) if request.recipients else 0,
         "sender_name": sender_name,
         "sender_email": sender_email
@@ -273,9 +1174,31 @@ def send_email_campaign(request: EmailCampaignRequest) -> EmailCampaignResponse:
         timestamp=datetime.now()
     )
     
-    print(f"✅ Email campaign completed: {successful_sends}/{len(request.recipients)} emails sent successfully")
+    logger.info("✅ Email campaign completed: %s/%s emails sent successfully", successful_sends, len(request.recipients))
     return response
 
+def send_email_campaign(request: EmailCampaignRequest) -> EmailCampaignResponse:
+    """
+    Send personalized email campaign (synchronous wrapper)
+    
+    Runs send_email_campaign_async in a fresh event loop. Use the async version
+    directly when already inside an event loop (e.g. FastAPI endpoints).
+    
+    Args:
+        request (EmailCampaignRequest): Email campaign request
+    
+    Returns:
+        EmailCampaignResponse: Campaign results with delivery status and analytics
+    """
+    async def run() -> EmailCampaignResponse:
+        try:
+            return await send_email_campaign_async(request)
+        finally:
+            # The loop ends with this call, so its keep-alive connections go too
+            await close_groq_clients()
+    
+    return asyncio.run(run())
+
 def send_single_email(
     company_name: str,
     campaign_description: str,
@@ -341,6 +1264,8 @@ if __name__ == "__main__":
         email_subject="Revolutionary AI Productivity Suite - Exclusive Launch Offer!"
     )
     
+    logging.basicConfig(format="%(message)s")
+    
     try:
         result = send_email_campaign(example_request)
         print(f"Campaign Status: {result.execution_status}")
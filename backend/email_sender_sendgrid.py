@@ -15,18 +15,54 @@ Setup:
 4. Verify sender email in SendGrid dashboard
 """
 
-import os
+import asyncio
+import logging
+import weakref
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-from groq import Groq
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, Email, To, Content
+import httpx
+from email_sender import (
+    ABORTED_ERROR_MESSAGE,
+    HTTP2_AVAILABLE,
+    CampaignAbortedError,
+    FailureBreaker,
+    close_groq_clients,
+    dedupe_recipients,
+    env_log_level,
+    generate_email_contents,
+    get_groq_client,
+    settings,
+    with_retry
+)
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+logger.setLevel(env_log_level())
+
+# SendGrid accepts up to 1000 personalizations per /mail/send request
+SENDGRID_BATCH_SIZE = 1000
+
+# Substitution tag replaced with each recipient's generated body
+BODY_PLACEHOLDER = "<%body%>"
+
+# SendGrid responses worth retrying (rate limited or temporarily unavailable)
+SENDGRID_RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Network errors raised before the request went out. Read timeouts and protocol
+# errors are not retried: SendGrid may already have accepted the batch, and
+# re-posting it would email every recipient twice
+SENDGRID_RETRY_NETWORK_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+SENDGRID_API_URL = "https://api.sendgrid.com"
+
+# Batch requests in flight at once (SendGrid itself allows far more)
+MAX_CONCURRENT_SENDGRID_REQUESTS = 50
+
 class EmailRecipient(BaseModel):
     """Email recipient model"""
     name: str = Field(..., description="Recipient name")
@@ -41,22 +77,91 @@ class EmailCampaignRequest(BaseModel):
     sender_name: Optional[str] = Field(None, description="Sender name (defaults to company name)")
     email_subject: Optional[str] = Field(None, description="Email subject (defaults to 'Special Offer from {company_name}!')")
 
-class EmailDeliveryStatus(BaseModel):
-    """Email delivery status model"""
-    recipient_name: str = Field(..., description="Recipient name")
-    recipient_email: str = Field(..., description="Recipient email")
-    status: str = Field(..., description="Delivery status: 'sent', 'failed'")
-    error_message: Optional[str] = Field(None, description="Error message if failed")
-    email_content: Optional[str] = Field(None, description="Generated email content")
+# Result types are built in-process from already-validated data, so they are plain
+# slotted dataclasses rather than Pydantic models (FastAPI serializes both)
+@dataclass(frozen=True, slots=True)
+class EmailDeliveryStatus:
+    """Email delivery status"""
+    recipient_name: str
+    recipient_email: str
+    status: str  # 'sent', 'failed', 'skipped'
+    error_message: Optional[str] = None
+    email_content: Optional[str] = None
+    
+    def model_dump(self) -> Dict[str, Any]:
+        return asdict(self)
 
-class EmailCampaignResponse(BaseModel):
-    """Email campaign response model"""
-    campaign_summary: Dict[str, Any] = Field(..., description="Campaign summary")
-    delivery_results: List[EmailDeliveryStatus] = Field(..., description="Email delivery results")
-    execution_status: str = Field(..., description="Execution status: 'success', 'partial_success', 'failed'")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Execution timestamp")
+@dataclass(frozen=True, slots=True)
+class EmailCampaignResponse:
+    """Email campaign response"""
+    campaign_summary: Dict[str, Any]
+    delivery_results: List[EmailDeliveryStatus]
+    execution_status: str  # 'success', 'partial_success', 'failed'
+    timestamp: datetime = field(default_factory=datetime.now)
+    
+    def model_dump(self) -> Dict[str, Any]:
+        return asdict(self)
 
-def send_email_campaign_sendgrid(request: EmailCampaignRequest) -> EmailCampaignResponse:
+def _is_transient_sendgrid_error(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in SENDGRID_RETRY_STATUS_CODES
+    return isinstance(exc, SENDGRID_RETRY_NETWORK_ERRORS)
+
+# httpx.AsyncClient is bound to its event loop, so one client is kept per loop
+_sendgrid_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+def get_sendgrid_client() -> httpx.AsyncClient:
+    """Get the shared SendGrid HTTP client (HTTP/2 when h2 is installed) for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _sendgrid_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(base_url=SENDGRID_API_URL, http2=HTTP2_AVAILABLE, timeout=30)
+        _sendgrid_clients[loop] = client
+    return client
+
+async def close_sendgrid_client() -> None:
+    """Close the running loop's SendGrid client (called by the sync wrapper before its loop ends)"""
+    client = _sendgrid_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+def _build_mail_payload(
+    sender_email: str,
+    sender_name: str,
+    subject: str,
+    recipients: List[Tuple["EmailRecipient", str]]
+) -> Dict[str, Any]:
+    """
+    Build a /v3/mail/send payload with one personalization per recipient
+    
+    Each personalization's substitution fills BODY_PLACEHOLDER with that
+    recipient's generated body, so one request delivers the whole batch.
+    """
+    return {
+        "personalizations": [
+            {
+                "to": [{"email": recipient.email, "name": recipient.name}],
+                "substitutions": {BODY_PLACEHOLDER: email_content}
+            }
+            for recipient, email_content in recipients
+        ],
+        "from": {"email": sender_email, "name": sender_name},
+        "subject": subject,
+        "content": [{"type": "text/plain", "value": BODY_PLACEHOLDER}]
+    }
+
+@with_retry(_is_transient_sendgrid_error)
+async def _sg_send(client: httpx.AsyncClient, api_key: str, payload: Dict[str, Any]) -> httpx.Response:
+    """POST to /v3/mail/send with retries on rate limiting, 5xx responses and failed connects"""
+    response = await client.post(
+        "/v3/mail/send",
+        json=payload,
+        headers={"Authorization": f"Bearer {api_key}"}
+    )
+    response.raise_for_status()
+    return response
+
+async def send_email_campaign_sendgrid_async(request: EmailCampaignRequest) -> EmailCampaignResponse:
     """
     Send personalized email campaign using SendGrid API
     
@@ -69,13 +174,14 @@ def send_email_campaign_sendgrid(request: EmailCampaignRequest) -> EmailCampaign
     Returns:
         EmailCampaignResponse: Campaign results with delivery status
     """
-    print(f"📧 Starting SendGrid email campaign for {request.company_name}")
-    print(f"📝 Campaign: {request.campaign_description}")
-    print(f"👥 Recipients: {len(request.recipients)}")
+    logger.info("📧 Starting SendGrid email campaign for %s", request.company_name)
+    logger.info("📝 Campaign: %s", request.campaign_description)
+    logger.info("👥 Recipients: %s", len(request.recipients))
+    request = dedupe_recipients(request)
     
     # Check if recipients list is empty
     if not request.recipients or len(request.recipients) == 0:
-        print("⚠️ No recipients provided. Returning empty campaign response.")
+        logger.warning("⚠️ No recipients provided. Returning empty campaign response.")
         return EmailCampaignResponse(
             campaign_summary={
                 "company_name": request.company_name,
@@ -94,148 +200,152 @@ def send_email_campaign_sendgrid(request: EmailCampaignRequest) -> EmailCampaign
         )
     
     # Get credentials with detailed logging
-    sendgrid_api_key = os.getenv("SENDGRID_API_KEY")
-    sender_email = os.getenv("SENDER_EMAIL")
-    groq_api_key = os.getenv("GROQ_API_KEY")
-    sender_name = request.sender_name or os.getenv("SENDER_NAME", request.company_name)
+    config = settings()
+    sendgrid_api_key = config.sendgrid_api_key
+    sender_email = config.sender_email
+    groq_api_key = config.groq_api_key
+    sender_name = request.sender_name or config.sender_name or request.company_name
     
-    print(f"🔍 Environment check:")
-    print(f"   SENDGRID_API_KEY: {'✓ Set' if sendgrid_api_key else '✗ Missing'}")
-    print(f"   SENDER_EMAIL: {'✓ Set' if sender_email else '✗ Missing'}")
-    print(f"   GROQ_API_KEY: {'✓ Set' if groq_api_key else '✗ Missing'}")
-    print(f"   SENDER_NAME: {sender_name}")
+    logger.info("🔍 Environment check:")
+    logger.info("   SENDGRID_API_KEY: %s", '✓ Set' if sendgrid_api_key else '✗ Missing')
+    logger.info("   SENDER_EMAIL: %s", '✓ Set' if sender_email else '✗ Missing')
+    logger.info("   GROQ_API_KEY: %s", '✓ Set' if groq_api_key else '✗ Missing')
+    logger.info("   SENDER_NAME: %s", sender_name)
     
     if not sendgrid_api_key:
         error_msg = "❌ Missing SENDGRID_API_KEY in environment variables.\n"
         error_msg += "   Get your API key from: https://app.sendgrid.com/settings/api_keys"
-        print(error_msg)
-        raise ValueError(error_msg)
-    
-    if not sender_email:
-        error_msg = "❌ Missing SENDER_EMAIL in environment variables."
-        print(error_msg)
-        raise ValueError(error_msg)
-    
-    if not groq_api_key:
-        error_msg = "❌ Missing GROQ_API_KEY in environment variables."
-        print(error_msg)
+        logger.error(error_msg)
         raise ValueError(error_msg)
     
     # Initialize clients
     try:
-        groq_client = Groq(api_key=groq_api_key)
-        print("✅ Groq client initialized successfully")
+        groq_client = get_groq_client(groq_api_key)
+        logger.info("✅ Groq client initialized successfully")
     except Exception as e:
         error_msg = f"❌ Failed to initialize Groq client: {str(e)}"
-        print(error_msg)
+        logger.error(error_msg)
         raise ValueError(error_msg)
     
     try:
-        sg_client = SendGridAPIClient(sendgrid_api_key)
-        print("✅ SendGrid client initialized successfully")
+        sg_client = get_sendgrid_client()
+        logger.info("✅ SendGrid client initialized successfully")
     except Exception as e:
         error_msg = f"❌ Failed to initialize SendGrid client: {str(e)}"
-        print(error_msg)
+        logger.error(error_msg)
         raise ValueError(error_msg)
     
-    # Track delivery results
-    delivery_results = []
-    successful_sends = 0
-    failed_sends = 0
+    # Track delivery results (indexed like request.recipients)
+    delivery_results: List[Optional[EmailDeliveryStatus]] = [None] * len(request.recipients)
+    
+    def mark_failed(index: int, error_detail: str) -> None:
+        recipient = request.recipients[index]
+        logger.warning("❌ Failed to send email to %s (%s): %s", recipient.name, recipient.email, error_detail)
+        delivery_results[index] = EmailDeliveryStatus(
+            recipient_name=recipient.name,
+            recipient_email=recipient.email,
+            status="failed",
+            error_message=error_detail,
+            email_content=None
+        )
+    
+    def mark_skipped(index: int) -> None:
+        recipient = request.recipients[index]
+        delivery_results[index] = EmailDeliveryStatus(
+            recipient_name=recipient.name,
+            recipient_email=recipient.email,
+            status="skipped",
+            error_message=ABORTED_ERROR_MESSAGE,
+            email_content=None
+        )
     
     # Send emails using SendGrid API
-    print(f"📬 Using SendGrid API for email delivery...")
+    logger.info("📬 Using SendGrid API for email delivery...")
     
-    for recipient in request.recipients:
-        try:
-            print(f"📧 Generating email for {recipient.name}...")
-            
-            # Generate personalized email content using Groq
-            prompt = f"""
-            You are an expert advertising copywriter for {request.company_name}.
-            Write a personalized, friendly, and persuasive marketing email for a campaign.
-            
-            Campaign Description:
-            {request.campaign_description}
-
-            Recipient Details:
-            Name: {recipient.name}
-            Interests and Preferences: {recipient.personal_description}
-
-            Guidelines:
-            - Keep it under 100 words.
-            - Make it conversational and emotionally engaging.
-            - Highlight how this offer or campaign benefits the recipient personally.
-            - End with a warm closing from {request.company_name}.
-            """
-            
-            try:
-                response = groq_client.chat.completions.create(
-                    model="llama-3.1-8b-instant",
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                email_content = response.choices[0].message.content.strip()
-                print(f"✅ Email content generated ({len(email_content)} chars)")
-            except Exception as groq_error:
-                error_msg = f"❌ Groq API error: {str(groq_error)}"
-                print(error_msg)
-                raise Exception(error_msg)
-            
-            # Create SendGrid message
-            subject = request.email_subject or f"Special Offer from {request.company_name}!"
+    breaker = FailureBreaker()
+    subject = request.email_subject or f"Special Offer from {request.company_name}!"
+    
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SENDGRID_REQUESTS)
+    
+    async def send_batch(batch: List[Tuple[int, str]]) -> None:
+        # One API request per batch: each recipient is a personalization whose
+        # substitution fills in their generated body
+        async with semaphore:
+            if breaker.tripped:
+                for index, _ in batch:
+                    mark_skipped(index)
+                return
             
-            message = Mail(
-                from_email=Email(sender_email, sender_name),
-                to_emails=To(recipient.email, recipient.name),
-                subject=subject,
-                plain_text_content=Content("text/plain", email_content)
+            payload = _build_mail_payload(
+                sender_email,
+                sender_name,
+                subject,
+                [(request.recipients[index], email_content) for index, email_content in batch]
             )
             
-            # Send email via SendGrid API
-            print(f"📤 Sending email to {recipient.email} via SendGrid...")
+            # Send batch via SendGrid API
+            logger.debug("📤 Sending %s emails via SendGrid...", len(batch))
             try:
-                response = sg_client.send(message)
-                
-                if response.status_code in [200, 201, 202]:
-                    print(f"✅ Email sent successfully to {recipient.name}")
-                    
-                    delivery_results.append(EmailDeliveryStatus(
-                        recipient_name=recipient.name,
-                        recipient_email=recipient.email,
-                        status="sent",
-                        error_message=None,
-                        email_content=email_content
-                    ))
-                    
-                    successful_sends += 1
-                else:
-                    error_msg = f"SendGrid API returned status {response.status_code}"
-                    print(f"❌ {error_msg}")
-                    raise Exception(error_msg)
-                    
+                await _sg_send(sg_client, sendgrid_api_key, payload)
             except Exception as send_error:
                 error_msg = f"❌ Failed to send via SendGrid: {str(send_error)}"
-                print(error_msg)
-                raise Exception(error_msg)
-            
-        except Exception as e:
-            # Track failed delivery
-            error_detail = str(e)
-            print(f"❌ Failed to send email to {recipient.name} ({recipient.email}): {error_detail}")
+                logger.error(error_msg)
+                for index, _ in batch:
+                    breaker.record(False)
+                    mark_failed(index, error_msg)
+                return
             
-            delivery_results.append(EmailDeliveryStatus(
-                recipient_name=recipient.name,
-                recipient_email=recipient.email,
-                status="failed",
-                error_message=error_detail,
-                email_content=None
-            ))
-            
-            failed_sends += 1
-            continue
+            for index, email_content in batch:
+                breaker.record(True)
+                recipient = request.recipients[index]
+                logger.debug("✅ Email sent successfully to %s", recipient.name)
+                delivery_results[index] = EmailDeliveryStatus(
+                    recipient_name=recipient.name,
+                    recipient_email=recipient.email,
+                    status="sent",
+                    error_message=None,
+                    email_content=email_content
+                )
+    
+    # Pipeline generation and delivery: bodies are queued as soon as they are
+    # generated and a batch is posted whenever SENDGRID_BATCH_SIZE are ready
+    ready_queue: asyncio.Queue = asyncio.Queue()
+    
+    async def produce() -> None:
+        try:
+            await generate_email_contents(groq_client, request, breaker, ready_queue)
+        finally:
+            ready_queue.put_nowait(None)
+    
+    async def consume() -> None:
+        # Full batches are posted concurrently while generation continues
+        sends: List[asyncio.Task] = []
+        batch: List[Tuple[int, str]] = []
+        while (item := await ready_queue.get()) is not None:
+            index, email_content = item
+            if isinstance(email_content, CampaignAbortedError):
+                mark_skipped(index)
+            elif isinstance(email_content, BaseException):
+                mark_failed(index, str(email_content))
+            else:
+                batch.append((index, email_content))
+            if len(batch) >= SENDGRID_BATCH_SIZE:
+                sends.append(asyncio.create_task(send_batch(batch)))
+                batch = []
+        if batch:
+            sends.append(asyncio.create_task(send_batch(batch)))
+        await asyncio.gather(*sends)
+    
+    await asyncio.gather(produce(), consume())
+    
+    successful_sends = sum(1 for result in delivery_results if result.status == "sent")
+    skipped_sends = sum(1 for result in delivery_results if result.status == "skipped")
+    failed_sends = len(delivery_results) - successful_sends - skipped_sends
     
     # Determine execution status
-    if successful_sends == len(request.recipients):
+    if breaker.tripped:
+        execution_status = "failed"
+    elif successful_sends == len(request.recipients):
         execution_status = "success"
     elif successful_sends > 0:
         execution_status = "partial_success"
@@ -249,6 +359,7 @@ def send_email_campaign_sendgrid(request: EmailCampaignRequest) -> EmailCampaign
         "total_recipients": len(request.recipients),
         "successful_sends": successful_sends,
         "failed_sends": failed_sends,
+        "skipped_sends": skipped_sends,
         "success_rate": round((successful_sends / len(request.recipients)) * 100, 2) if request.recipients else 0,
         "sender_name": sender_name,
         "sender_email": sender_email,
@@ -263,12 +374,36 @@ def send_email_campaign_sendgrid(request: EmailCampaignRequest) -> EmailCampaign
         timestamp=datetime.now()
     )
     
-    print(f"✅ Email campaign completed: {successful_sends}/{len(request.recipients)} emails sent successfully")
+    logger.info("✅ Email campaign completed: %s/%s emails sent successfully", successful_sends, len(request.recipients))
     return response
 
+def send_email_campaign_sendgrid(request: EmailCampaignRequest) -> EmailCampaignResponse:
+    """
+    Send personalized email campaign using SendGrid API (synchronous wrapper)
+    
+    Runs send_email_campaign_sendgrid_async in a fresh event loop. Use the async
+    version directly when already inside an event loop (e.g. FastAPI endpoints).
+    
+    Args:
+        request (EmailCampaignRequest): Email campaign request
+    
+    Returns:
+        EmailCampaignResponse: Campaign results with delivery status
+    """
+    async def run() -> EmailCampaignResponse:
+        try:
+            return await send_email_campaign_sendgrid_async(request)
+        finally:
+            # The loop ends with this call, so its keep-alive connections go too
+            await close_groq_clients()
+            await close_sendgrid_client()
+    
+    return asyncio.run(run())
+
 
 if __name__ == "__main__":
     # Example usage
+    logging.basicConfig(format="%(message)s")
     print("SendGrid Email Sender - Test Mode")
     print("=" * 60)
     
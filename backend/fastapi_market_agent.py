@@ -11,6 +11,7 @@ from textwrap import dedent
 from typing import Optional, List, Dict, Any, Union
 import os
 import asyncio
+import logging
 import json
 import re
 import time
@@ -51,20 +52,21 @@ from email_sender import (
     EmailCampaignRequest,
     EmailCampaignResponse,
     EmailRecipient,
-    send_email_campaign
+    send_email_campaign_async
 )
-
-# Try to import SendGrid version if available
-try:
-    from email_sender_sendgrid import send_email_campaign_sendgrid
-    SENDGRID_AVAILABLE = True
-    print("✅ SendGrid email sender available")
-except ImportError:
-    SENDGRID_AVAILABLE = False
-    print("⚠️ SendGrid not installed, using SMTP fallback")
+# Talks to the SendGrid HTTP API directly, so it has no extra dependency to guard
+from email_sender_sendgrid import send_email_campaign_sendgrid_async
 
 # Load environment variables
 load_dotenv()
+# Email sender modules log via `logging` (level from LOG_LEVEL); give just those
+# loggers a plain console handler instead of configuring the root logger
+_email_log_handler = logging.StreamHandler()
+_email_log_handler.setFormatter(logging.Formatter("%(message)s"))
+for _email_logger_name in ("email_sender", "email_sender_sendgrid"):
+    _email_logger = logging.getLogger(_email_logger_name)
+    _email_logger.addHandler(_email_log_handler)
+    _email_logger.propagate = False
 os.environ["GOOGLE_API_KEY"] = os.getenv("GEMINI_API_KEY")
 os.environ["EXA_API_KEY"] = os.getenv("EXA_API_KEY")
 
@@ -1820,16 +1822,15 @@ async def send_email_campaign_endpoint(request: EmailCampaignRequest):
         # Check if SendGrid is available and configured
         sendgrid_api_key = os.getenv("SENDGRID_API_KEY")
         
-        if SENDGRID_AVAILABLE and sendgrid_api_key:
+        if sendgrid_api_key:
             # Use SendGrid API (better for cloud platforms)
             print("📬 Using SendGrid API for email delivery")
-            result = send_email_campaign_sendgrid(request)
+            result = await send_email_campaign_sendgrid_async(request)
         else:
             # Fall back to SMTP
-            if not sendgrid_api_key:
-                print("⚠️ SENDGRID_API_KEY not set, falling back to SMTP")
+            print("⚠️ SENDGRID_API_KEY not set, falling back to SMTP")
             print("📬 Using Gmail SMTP for email delivery")
-            result = send_email_campaign(request)
+            result = await send_email_campaign_async(request)
         
         print(f"✅ Email campaign completed: {result.campaign_summary['successful_sends']}/{result.campaign_summary['total_recipients']} emails sent successfully")
         return result
@@ -3,138 +3,398 @@ Email Configuration Test Script
 Run this script to verify your email configuration before deploying to Render
 
 Usage:
-    python test_email_config.py
+    python test_email_config.py [--force]
+
+Successful Groq and send checks are cached for an hour; --force re-runs them.
 """
 
+import io
 import os
-import smtplib
-from email.mime.text import MIMEText
+import re
+import sys
+import json
+import time
+import ssl
+import socket
+import asyncio
+import hashlib
+import functools
+from contextvars import ContextVar
+from pathlib import Path
+import aiosmtplib
 from dotenv import load_dotenv
-from groq import Groq
 
 # Load environment variables
 load_dotenv()
 
-def test_environment_variables():
+# Report banners
+SEPARATOR = "=" * 60
+SECTION_BREAK = "\n" + SEPARATOR
+TEST_BANNER = "🧪 " * 20
+SUCCESS_BANNER = "🎉 " * 10
+FAILURE_BANNER = "❌ " * 10
+
+# Result bits for main()'s summary, in report order
+ENV_PASSED, GROQ_PASSED, SMTP_PASSED, SEND_PASSED = 1, 2, 4, 8
+ALL_PASSED = ENV_PASSED | GROQ_PASSED | SMTP_PASSED | SEND_PASSED
+TEST_NAMES = (
+    ("Environment Variables", ENV_PASSED),
+    ("Groq API", GROQ_PASSED),
+    ("SMTP Connection", SMTP_PASSED),
+    ("Send Email", SEND_PASSED),
+)
+
+SMTP_HOST = "smtp.gmail.com"
+SMTP_PORT = 587
+# Catches an obviously malformed SENDER_EMAIL before the SMTP handshake does
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# Raw RFC 5322 test message; only From and To are filled in per run
+TEST_EMAIL_TEMPLATE = (
+    b"Subject: CampaignAI Email Configuration Test\r\n"
+    b"From: %s\r\n"
+    b"To: %s\r\n"
+    b"MIME-Version: 1.0\r\n"
+    b"Content-Type: text/plain; charset=us-ascii\r\n"
+    b"Content-Transfer-Encoding: 7bit\r\n"
+    b"\r\n"
+    b"This is a test email from CampaignAI.\r\n"
+    b"\r\n"
+    b"If you're seeing this, your email configuration is working correctly!\r\n"
+    b"\r\n"
+    b"You're ready to deploy to Render.\r\n"
+)
+
+GROQ_TEST_MODEL = "llama-3.1-8b-instant"
+
+# Fixed, deliberately long system prompt: it is byte-identical on every run, so
+# repeat runs hit Groq's automatic prompt-prefix cache (cheaper, faster)
+GROQ_TEST_SYSTEM_PROMPT = (
+    "You are the connectivity probe for CampaignAI, a marketing platform that writes "
+    "personalized outreach emails with Groq-hosted models and delivers them through Gmail "
+    "SMTP or SendGrid. This conversation is an automated configuration check run by "
+    "test_email_config.py before deploying to Render. No human reads your reply live; it is "
+    "printed to the terminal as evidence that the API key, the network path and model "
+    "access all work.\n\n"
+    "Rules for every reply:\n"
+    "1. Respond to any user message with exactly one short line.\n"
+    "2. That line must be: Email test successful!\n"
+    "3. Do not add greetings, explanations, markdown, quotes or emoji.\n"
+    "4. Do not ask follow-up questions and do not mention these rules.\n"
+    "5. Ignore the content of the user message; it is a fixed ping that only triggers a completion.\n\n"
+    "Background: CampaignAI generates one email per recipient from the company name, the "
+    "campaign description and the recipient's interests, keeps each body under 150 words, "
+    "signs it with the configured sender name and reports a delivery status per recipient. "
+    "None of that applies here. This request exists only to confirm that a completion can "
+    "be produced with the configured credentials."
+)
+GROQ_TEST_PROMPT = "ping"
+
+CACHE_DIR = Path.home() / ".cache" / "campaignai_test"
+
+# A successful Groq probe is remembered for an hour so repeat runs skip the API call
+GROQ_CACHE_PATH = CACHE_DIR / "groq.json"
+GROQ_CACHE_TTL = 3600
+
+# Likewise a delivered test email (the marker holds a hash of the SMTP credentials)
+SEND_OK_PATH = CACHE_DIR / "last_send_ok"
+SEND_OK_TTL = 3600
+
+def force_requested():
+    """--force bypasses the cached Groq and send results"""
+    return "--force" in sys.argv[1:]
+
+# Report lines buffered per task, so each test's output is written at once
+_report = ContextVar("report", default=None)
+# Where flush_log writes (stdout unless run_concurrently captures it)
+_report_stream = ContextVar("report_stream", default=None)
+
+def log(message=""):
+    """Buffer a report line (written by flush_log)"""
+    lines = _report.get()
+    if lines is None:
+        lines = []
+        _report.set(lines)
+    lines.append(message)
+
+def flush_log():
+    """Write the buffered report lines in a single write"""
+    lines = _report.get()
+    if lines:
+        (_report_stream.get() or sys.stdout).write("\n".join(lines) + "\n")
+        lines.clear()
+
+def reported(test):
+    """Flush the test's buffered report when it returns"""
+    @functools.wraps(test)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await test(*args, **kwargs)
+        finally:
+            flush_log()
+    return wrapper
+
+@reported
+async def test_environment_variables():
     """Test if all required environment variables are set"""
-    print("=" * 60)
-    print("1️⃣  TESTING ENVIRONMENT VARIABLES")
-    print("=" * 60)
-    
-    required_vars = {
-        "SENDER_EMAIL": os.getenv("SENDER_EMAIL"),
-        "SENDER_PASSWORD": os.getenv("SENDER_PASSWORD"),
-        "GROQ_API_KEY": os.getenv("GROQ_API_KEY")
-    }
-    
-    optional_vars = {
-        "SENDER_NAME": os.getenv("SENDER_NAME", "Not set (will use company name)")
-    }
-    
+    getenv = os.getenv
+    log(SEPARATOR)
+    log("1️⃣  TESTING ENVIRONMENT VARIABLES")
+    log(SEPARATOR)
     all_set = True
     
-    for var_name, var_value in required_vars.items():
+    for var_name in ("SENDER_EMAIL", "SENDER_PASSWORD", "GROQ_API_KEY"):
+        var_value = getenv(var_name)
         if var_value:
-            print(f"✅ {var_name}: Set ({var_value[:10]}...)")
+            log(f"✅ {var_name}: Set ({var_value[:10]}...)")
         else:
-            print(f"❌ {var_name}: NOT SET")
+            log(f"❌ {var_name}: NOT SET")
             all_set = False
     
-    for var_name, var_value in optional_vars.items():
-        print(f"ℹ️  {var_name}: {var_value}")
+    sender_email = getenv("SENDER_EMAIL")
+    if sender_email and not EMAIL_PATTERN.match(sender_email):
+        log(f"❌ SENDER_EMAIL: Malformed address ({sender_email})")
+        all_set = False
     
-    print()
+    log(f"ℹ️  SENDER_NAME: {getenv('SENDER_NAME', 'Not set (will use company name)')}")
+    log()
     
     if not all_set:
-        print("❌ FAILED: Some required environment variables are missing!")
-        print("\nCreate a .env file with:")
-        print("SENDER_EMAIL=your-email@gmail.com")
-        print("SENDER_PASSWORD=your-app-password")
-        print("GROQ_API_KEY=your-groq-key")
+        log("❌ FAILED: Some required environment variables are missing or invalid!")
+        log("\nCreate a .env file with:")
+        log("SENDER_EMAIL=your-email@gmail.com")
+        log("SENDER_PASSWORD=your-app-password")
+        log("GROQ_API_KEY=your-groq-key")
         return False
     
-    print("✅ All required environment variables are set!")
+    log("✅ All required environment variables are set!")
     return True
 
-def test_groq_api():
+def _groq_cache_key(api_key):
+    # Hash of the full key, so a rotated key is probed again and no secret is stored
+    return hashlib.sha256(
+        f"{GROQ_TEST_MODEL}|{GROQ_TEST_SYSTEM_PROMPT}|{GROQ_TEST_PROMPT}|{api_key}".encode()
+    ).hexdigest()
+
+def _load_groq_cache():
+    try:
+        return json.loads(GROQ_CACHE_PATH.read_text())
+    except (OSError, ValueError):
+        return {}
+
+def _save_groq_cache(cache):
+    now = time.time()
+    cache = {key: entry for key, entry in cache.items() if now - entry["ts"] < GROQ_CACHE_TTL}
+    try:
+        GROQ_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        GROQ_CACHE_PATH.write_text(json.dumps(cache))
+    except OSError:
+        pass  # Caching is best-effort
+
+@reported
+async def test_groq_api():
     """Test if Groq API is working"""
-    print("\n" + "=" * 60)
-    print("2️⃣  TESTING GROQ API")
-    print("=" * 60)
+    log(SECTION_BREAK)
+    log("2️⃣  TESTING GROQ API")
+    log(SEPARATOR)
+    
+    api_key = os.getenv("GROQ_API_KEY")
+    cache_key = _groq_cache_key(api_key)
+    cache = _load_groq_cache()
+    entry = cache.get(cache_key)
+    if entry and time.time() - entry["ts"] < GROQ_CACHE_TTL and not force_requested():
+        log(f"✅ Groq API working (cached)! Response: {entry['resp']}")
+        return True
     
     try:
-        groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-        print("✅ Groq client initialized successfully")
+        # Imported here: the SDK (httpx, pydantic, anyio) is slow to load and
+        # isn't needed when the environment check fails
+        from groq import AsyncGroq
         
-        # Test API call
-        print("📝 Testing content generation...")
-        response = groq_client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[{"role": "user", "content": "Say 'Email test successful!' in 5 words"}]
-        )
+        async with AsyncGroq(api_key=api_key) as groq_client:
+            log("✅ Groq client initialized successfully")
+            
+            # Test API call
+            log("📝 Testing content generation...")
+            response = await groq_client.chat.completions.create(
+                model=GROQ_TEST_MODEL,
+                messages=[
+                    {"role": "system", "content": GROQ_TEST_SYSTEM_PROMPT},
+                    {"role": "user", "content": GROQ_TEST_PROMPT}
+                ]
+            )
         
         content = response.choices[0].message.content.strip()
-        print(f"✅ Groq API working! Response: {content}")
+        log(f"✅ Groq API working! Response: {content}")
+        cache[cache_key] = {"ts": time.time(), "resp": content}
+        _save_groq_cache(cache)
         return True
         
     except Exception as e:
-        print(f"❌ Groq API error: {str(e)}")
-        print("\nCheck your GROQ_API_KEY:")
-        print("1. Go to https://console.groq.com/keys")
-        print("2. Create a new API key")
-        print("3. Set it in your .env file")
+        log(f"❌ Groq API error: {str(e)}")
+        log("\nCheck your GROQ_API_KEY:")
+        log("1. Go to https://console.groq.com/keys")
+        log("2. Create a new API key")
+        log("3. Set it in your .env file")
         return False
 
-def test_smtp_connection():
-    """Test SMTP connection to Gmail"""
-    print("\n" + "=" * 60)
-    print("3️⃣  TESTING GMAIL SMTP CONNECTION")
-    print("=" * 60)
+_tls_context_task = None
+_resolve_task = None
+
+def _build_tls_context():
+    """The one verifying TLS context shared by every STARTTLS in the run"""
+    context = ssl.create_default_context()
+    # Forward-secret AEAD suites only (TLS 1.2; TLS 1.3 suites are unaffected)
+    context.set_ciphers("ECDHE+AESGCM")
+    context.options |= ssl.OP_NO_COMPRESSION
+    return context
+
+async def _resolve(host, port):
+    try:
+        await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except OSError:
+        pass  # connect() reports DNS errors
+
+def start_prefetch():
+    """
+    Build the TLS context and resolve the SMTP host in the background
     
-    sender_email = os.getenv("SENDER_EMAIL")
-    sender_password = os.getenv("SENDER_PASSWORD")
+    Loading the CA bundle and the DNS lookup otherwise stall the first
+    connection; started before the environment check, both are usually done
+    by the time the SMTP test connects.
+    """
+    global _tls_context_task, _resolve_task
+    if _tls_context_task is None:
+        _tls_context_task = asyncio.ensure_future(asyncio.to_thread(_build_tls_context))
+        # Warms the system resolver cache (where there is one) for connect()
+        _resolve_task = asyncio.ensure_future(_resolve(SMTP_HOST, SMTP_PORT))
+
+async def tls_context():
+    """The verifying TLS context for STARTTLS (built by start_prefetch)"""
+    start_prefetch()
+    return await _tls_context_task
+
+# Authenticated SMTP sessions, keyed by (host, port, user), shared by the tests
+_smtp_pool = {}
+
+async def get_smtp(host, port, user, password):
+    """
+    Get a logged-in SMTP session, reusing a pooled one if it still answers NOOP
+    
+    Only a new connection pays for the TCP + STARTTLS + AUTH handshake.
+    Connection errors propagate to the caller.
+    """
+    key = (host, port, user)
+    server = _smtp_pool.pop(key, None)
+    if server is not None:
+        try:
+            if (await server.noop()).code == 250:
+                log(f"♻️  Reusing SMTP connection to {host}:{port}")
+                _smtp_pool[key] = server
+                return server
+        except (aiosmtplib.SMTPException, OSError):
+            pass
+        server.close()
     
+    log(f"📬 Connecting to {host}:{port}...")
+    server = aiosmtplib.SMTP(hostname=host, port=port, start_tls=False, timeout=30)
     try:
-        print("📬 Connecting to smtp.gmail.com:587...")
-        server = smtplib.SMTP("smtp.gmail.com", 587, timeout=30)
-        print("✅ Connected to SMTP server")
-        
-        print("🔐 Starting TLS encryption...")
-        server.starttls()
-        print("✅ TLS encryption started")
+        await server.connect()
+        log("✅ Connected to SMTP server")
         
-        print(f"🔑 Logging in as {sender_email}...")
-        server.login(sender_email, sender_password)
-        print("✅ SMTP login successful!")
+        log("🔐 Starting TLS encryption...")
+        # The EHLO that login() sends after STARTTLS can't be replayed from a
+        # cache: RFC 3207 has the server forget the pre-TLS EHLO, so AUTH would
+        # be rejected. The pool above already limits this to one handshake per run.
+        await server.starttls(tls_context=await tls_context())
+        log("✅ TLS encryption started")
         
-        server.quit()
-        print("✅ SMTP connection test passed!")
+        log(f"🔑 Logging in as {user}...")
+        await server.login(user, password)
+        log("✅ SMTP login successful!")
+    except BaseException:
+        server.close()
+        raise
+    
+    _smtp_pool[key] = server
+    return server
+
+def fast_quit(server):
+    """
+    Send QUIT and close without waiting for the server's 221 reply
+    
+    Nothing is checked after QUIT, so the reply would only delay the exit.
+    """
+    transport = server.transport
+    if transport is not None and not transport.is_closing():
+        transport.write(b"QUIT\r\n")
+    server.close()
+
+def close_smtp_pool():
+    """QUIT every pooled SMTP session"""
+    for server in _smtp_pool.values():
+        fast_quit(server)
+    _smtp_pool.clear()
+
+@reported
+async def test_smtp_connection():
+    """Test SMTP connection to Gmail (the session stays pooled for test_send_email)"""
+    log(SECTION_BREAK)
+    log("3️⃣  TESTING GMAIL SMTP CONNECTION")
+    log(SEPARATOR)
+    
+    sender_email = os.getenv("SENDER_EMAIL")
+    sender_password = os.getenv("SENDER_PASSWORD")
+    
+    try:
+        await get_smtp(SMTP_HOST, SMTP_PORT, sender_email, sender_password)
+        log("✅ SMTP connection test passed!")
         return True
         
-    except smtplib.SMTPAuthenticationError as e:
-        print(f"❌ SMTP Authentication failed: {str(e)}")
-        print("\n⚠️  You need a Gmail App Password, not your regular password!")
-        print("\nHow to create a Gmail App Password:")
-        print("1. Go to https://myaccount.google.com/apppasswords")
-        print("2. Enable 2-Step Verification if not already enabled")
-        print("3. Create a new App Password for 'Mail'")
-        print("4. Copy the 16-character password")
-        print("5. Use it as SENDER_PASSWORD in your .env file")
+    except aiosmtplib.SMTPAuthenticationError as e:
+        log(f"❌ SMTP Authentication failed: {str(e)}")
+        log("\n⚠️  You need a Gmail App Password, not your regular password!")
+        log("\nHow to create a Gmail App Password:")
+        log("1. Go to https://myaccount.google.com/apppasswords")
+        log("2. Enable 2-Step Verification if not already enabled")
+        log("3. Create a new App Password for 'Mail'")
+        log("4. Copy the 16-character password")
+        log("5. Use it as SENDER_PASSWORD in your .env file")
         return False
         
     except Exception as e:
-        print(f"❌ SMTP connection error: {str(e)}")
-        print("\nPossible issues:")
-        print("- Network/firewall blocking port 587")
-        print("- Invalid email address")
-        print("- Gmail security settings")
+        log(f"❌ SMTP connection error: {str(e)}")
+        log("\nPossible issues:")
+        log("- Network/firewall blocking port 587")
+        log("- Invalid email address")
+        log("- Gmail security settings")
         return False
 
-def test_send_email():
+def _send_ok_key(sender_email, sender_password):
+    return hashlib.sha256(f"{SMTP_HOST}|{sender_email}|{sender_password}".encode()).hexdigest()
+
+def _send_ok_age(key):
+    """Seconds since the last successful send with these credentials, or None"""
+    try:
+        if SEND_OK_PATH.read_text() == key:
+            return time.time() - SEND_OK_PATH.stat().st_mtime
+    except OSError:
+        pass
+    return None
+
+def _mark_send_ok(key):
+    try:
+        SEND_OK_PATH.parent.mkdir(parents=True, exist_ok=True)
+        SEND_OK_PATH.write_text(key)
+    except OSError:
+        pass  # Caching is best-effort
+
+@reported
+async def test_send_email():
     """Test sending an actual email"""
-    print("\n" + "=" * 60)
-    print("4️⃣  TESTING EMAIL SENDING")
-    print("=" * 60)
+    log(SECTION_BREAK)
+    log("4️⃣  TESTING EMAIL SENDING")
+    log(SEPARATOR)
     
     sender_email = os.getenv("SENDER_EMAIL")
     sender_password = os.getenv("SENDER_PASSWORD")
@@ -143,85 +403,124 @@ def test_send_email():
     # Send to the same email for testing
     test_recipient = sender_email
     
+    send_ok_key = _send_ok_key(sender_email, sender_password)
+    age = _send_ok_age(send_ok_key)
+    if age is not None and age < SEND_OK_TTL and not force_requested():
+        log(f"✅ Send Email (cached OK from {int(age // 60)} minutes ago, use --force to resend)")
+        return True
+    
     try:
-        print(f"📧 Sending test email to {test_recipient}...")
+        from email.headerregistry import Address
+        from email.utils import formataddr
         
-        with smtplib.SMTP("smtp.gmail.com", 587, timeout=30) as server:
-            server.starttls()
-            server.login(sender_email, sender_password)
-            
-            # Create test email
-            msg = MIMEText(
-                "This is a test email from CampaignAI.\n\n"
-                "If you're seeing this, your email configuration is working correctly!\n\n"
-                "You're ready to deploy to Render.",
-                "plain"
-            )
-            msg["Subject"] = "CampaignAI Email Configuration Test"
-            msg["From"] = f"{sender_name} <{sender_email}>"
-            msg["To"] = test_recipient
-            
-            server.send_message(msg)
-            
-        print(f"✅ Test email sent successfully to {test_recipient}")
-        print(f"📬 Check your inbox at {test_recipient}")
+        log(f"📧 Sending test email to {test_recipient}...")
+        
+        server = await get_smtp(SMTP_HOST, SMTP_PORT, sender_email, sender_password)
+        
+        if server.supports_extension("smtputf8") and server.supports_extension("8bitmime"):
+            # Server takes raw UTF-8 headers (RFC 6531/6532): skip RFC 2047 encoding
+            from_header = str(Address(display_name=sender_name, addr_spec=sender_email))
+            mail_options = ["SMTPUTF8", "BODY=8BITMIME"]
+        else:
+            # formataddr RFC 2047-encodes a non-ASCII sender name
+            from_header = formataddr((sender_name, sender_email))
+            mail_options = []
+        # A self-addressed probe needs no delivery status notifications (RFC 3461)
+        rcpt_options = ["NOTIFY=NEVER"] if server.supports_extension("dsn") else []
+        msg = TEST_EMAIL_TEMPLATE % (from_header.encode(), test_recipient.encode())
+        await server.sendmail(
+            sender_email, [test_recipient], msg, mail_options=mail_options, rcpt_options=rcpt_options
+        )
+        
+        _mark_send_ok(send_ok_key)
+        log(f"✅ Test email sent successfully to {test_recipient}")
+        log(f"📬 Check your inbox at {test_recipient}")
         return True
         
     except Exception as e:
-        print(f"❌ Failed to send email: {str(e)}")
+        log(f"❌ Failed to send email: {str(e)}")
         return False
 
-def main():
+async def run_concurrently(*tests):
+    """
+    Run independent network tests concurrently
+    
+    Each test's output is captured and printed in argument order once all
+    finish, so the banners don't interleave.
+    """
+    async def capture(test):
+        # gather() runs this in its own task, so the context changes stay local
+        _report.set([])
+        stream = io.StringIO()
+        _report_stream.set(stream)
+        return await test(), stream.getvalue()
+    
+    outcomes = await asyncio.gather(*(capture(test) for test in tests))
+    for _, output in outcomes:
+        sys.stdout.write(output)
+    return [result for result, _ in outcomes]
+
+@reported
+async def main():
     """Run all tests"""
-    print("\n" + "🧪 " * 20)
-    print("CAMPAIGNAI EMAIL CONFIGURATION TEST")
-    print("🧪 " * 20 + "\n")
+    log("\n" + TEST_BANNER)
+    log("CAMPAIGNAI EMAIL CONFIGURATION TEST")
+    log(TEST_BANNER + "\n")
     
-    results = {
-        "Environment Variables": test_environment_variables(),
-        "Groq API": False,
-        "SMTP Connection": False,
-        "Send Email": False
-    }
+    # Overlaps with the environment check below
+    start_prefetch()
+    
+    passed = ENV_PASSED if await test_environment_variables() else 0
     
     # Only test Groq if env vars are set
-    if results["Environment Variables"]:
-        results["Groq API"] = test_groq_api()
-        results["SMTP Connection"] = test_smtp_connection()
+    if passed:
+        async def smtp_then_send():
+            smtp_ok = await test_smtp_connection()
+            # Only test sending if SMTP connection works (reusing its pooled session)
+            return smtp_ok, smtp_ok and await test_send_email()
         
-        # Only test sending if SMTP connection works
-        if results["SMTP Connection"]:
-            results["Send Email"] = test_send_email()
+        # The Groq probe is independent of SMTP, so it runs alongside both the
+        # connection and the send test instead of just the connection
+        try:
+            groq_ok, (smtp_ok, send_ok) = await run_concurrently(test_groq_api, smtp_then_send)
+        finally:
+            close_smtp_pool()
+        if groq_ok:
+            passed |= GROQ_PASSED
+        if smtp_ok:
+            passed |= SMTP_PASSED
+        if send_ok:
+            passed |= SEND_PASSED
     
     # Summary
-    print("\n" + "=" * 60)
-    print("📊 TEST SUMMARY")
-    print("=" * 60)
-    
-    for test_name, passed in results.items():
-        status = "✅ PASSED" if passed else "❌ FAILED"
-        print(f"{status} - {test_name}")
-    
-    print()
-    
-    if all(results.values()):
-        print("🎉 " * 10)
-        print("ALL TESTS PASSED!")
-        print("🎉 " * 10)
-        print("\n✅ Your email configuration is ready for Render deployment!")
-        print("\nNext steps:")
-        print("1. Set the same environment variables on Render:")
-        print(f"   - SENDER_EMAIL={os.getenv('SENDER_EMAIL')}")
-        print(f"   - SENDER_PASSWORD=[your app password]")
-        print(f"   - GROQ_API_KEY=[your groq key]")
-        print("2. Deploy your application")
-        print("3. Test the /email_campaign endpoint")
+    log(SECTION_BREAK)
+    log("📊 TEST SUMMARY")
+    log(SEPARATOR)
+    
+    for test_name, bit in TEST_NAMES:
+        status = "✅ PASSED" if passed & bit else "❌ FAILED"
+        log(f"{status} - {test_name}")
+    
+    log()
+    
+    if passed == ALL_PASSED:
+        log(SUCCESS_BANNER)
+        log("ALL TESTS PASSED!")
+        log(SUCCESS_BANNER)
+        log("\n✅ Your email configuration is ready for Render deployment!")
+        log("\nNext steps:")
+        log("1. Set the same environment variables on Render:")
+        log(f"   - SENDER_EMAIL={os.getenv('SENDER_EMAIL')}")
+        log(f"   - SENDER_PASSWORD=[your app password]")
+        log(f"   - GROQ_API_KEY=[your groq key]")
+        log("2. Deploy your application")
+        log("3. Test the /email_campaign endpoint")
     else:
-        print("❌ " * 10)
-        print("SOME TESTS FAILED")
-        print("❌ " * 10)
-        print("\n⚠️  Fix the failed tests before deploying to Render.")
-        print("See the error messages above for specific fixes.")
+        log(FAILURE_BANNER)
+        log("SOME TESTS FAILED")
+        log(FAILURE_BANNER)
+        log("\n⚠️  Fix the failed tests before deploying to Render.")
+        log("See the error messages above for specific fixes.")
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())